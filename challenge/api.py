@@ -1,51 +1,71 @@
+import asyncio
+import threading
 import fastapi
-import pandas as pd
+import numpy as np
 from fastapi import HTTPException, Request
-from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel, field_validator
-from typing import List
-from challenge.model import DelayModel
+from fastapi.responses import ORJSONResponse
+from typing import Any, List, Tuple
+from challenge.model import DelayModel, MODEL_PATH, load_data
 
-app = fastapi.FastAPI()
+app = fastapi.FastAPI(default_response_class=ORJSONResponse)
 
-@app.exception_handler(RequestValidationError)
-async def validation_exception_handler(request: Request, exc: RequestValidationError):
-    return JSONResponse(
-        status_code=400,
-        content={"detail": "Validation error"},
-    )
-
-# Initialize and train the model
+# Initialize the model and train it in the background so startup is not blocked
 model = DelayModel()
+ready = threading.Event()
+trained = False
 
-# Load data and train model once at startup
-try:
-    data = pd.read_csv("data/data.csv", low_memory=False)
-    features, target = model.preprocess(data, target_column="delay")
-    model.fit(features, target)
-except Exception as e:
-    print(f"Warning: Could not train model at startup: {e}")
-
-class Flight(BaseModel):
-    OPERA: str
-    TIPOVUELO: str
-    MES: int
+def _train() -> None:
+    global trained
+    try:
+        if model.load(MODEL_PATH):
+            trained = True
+            return
+        data = load_data()
+        features, target = model.preprocess(data, target_column="delay")
+        model.fit(features, target)
+        trained = True
+    except Exception as e:
+        print(f"Warning: Could not train model at startup: {e}")
+        return
+    finally:
+        ready.set()
     
-    @field_validator('MES')
-    def validate_mes(cls, v):
-        if v < 1 or v > 12:
-            raise ValueError('MES must be between 1 and 12')
-        return v
+    # A failed cache write must not stop the freshly fitted model from serving
+    try:
+        model.save(MODEL_PATH)
+    except Exception as e:
+        print(f"Warning: Could not save model to {MODEL_PATH}: {e}")
+
+threading.Thread(target=_train, daemon=True).start()
+
+# Column index of each top 10 feature, keyed by the raw field value and derived
+# from the model so the API always follows its feature order
+_FEATURE_COLS = model.feature_columns()
+OPERA_COL = _FEATURE_COLS.get('OPERA', {})
+MES_COL = _FEATURE_COLS.get('MES', {})
+TIPOVUELO_COL = _FEATURE_COLS.get('TIPOVUELO', {})
+N_FEATURES = sum(len(values) for values in _FEATURE_COLS.values())
+
+def _validate_flights(payload: Any) -> List[Tuple[str, str, int]]:
+    """Validate the /predict body by hand and return (OPERA, TIPOVUELO, MES) tuples"""
+    if not isinstance(payload, dict) or not isinstance(payload.get("flights"), list):
+        raise ValueError('Body must contain a list of flights')
     
-    @field_validator('TIPOVUELO')
-    def validate_tipovuelo(cls, v):
-        if v not in ['I', 'N']:
+    flights = []
+    for flight in payload["flights"]:
+        if not isinstance(flight, dict):
+            raise ValueError('Each flight must be an object')
+        opera = flight.get("OPERA")
+        tipovuelo = flight.get("TIPOVUELO")
+        mes = flight.get("MES")
+        if not isinstance(opera, str):
+            raise ValueError('OPERA must be a string')
+        if tipovuelo not in ('I', 'N'):
             raise ValueError('TIPOVUELO must be I or N')
-        return v
-
-class FlightRequest(BaseModel):
-    flights: List[Flight]
+        if not isinstance(mes, int) or isinstance(mes, bool) or not 1 <= mes <= 12:
+            raise ValueError('MES must be between 1 and 12')
+        flights.append((opera, tipovuelo, mes))
+    return flights
 
 @app.get("/health", status_code=200)
 async def get_health() -> dict:
@@ -54,31 +74,37 @@ async def get_health() -> dict:
     }
 
 @app.post("/predict", status_code=200)
-async def post_predict(request: FlightRequest) -> dict:
+async def post_predict(request: Request) -> ORJSONResponse:
+    # Reject bad payloads right away, without waiting for the model
     try:
-        # Convert flight data to DataFrame format expected by model
-        flights_data = []
-        for flight in request.flights:
-            flights_data.append({
-                'OPERA': flight.OPERA,
-                'TIPOVUELO': flight.TIPOVUELO,
-                'MES': flight.MES
-            })
-        
-        flights_df = pd.DataFrame(flights_data)
-        
-        # Add required columns with dummy dates for preprocessing
-        flights_df['Fecha-I'] = '2017-01-01 12:00:00'  # Dummy date for feature engineering
-        
-        # Preprocess the data
-        features = model.preprocess(flights_df)
+        flights = _validate_flights(await request.json())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    # Never train from the request path; answer 503 until the startup thread is done
+    if not ready.is_set() and not await asyncio.to_thread(ready.wait, timeout=30):
+        raise HTTPException(status_code=503, detail="Model is not ready")
+    if not trained:
+        raise HTTPException(status_code=503, detail="Model is not available")
+    
+    try:
+        # Encode flights straight into the model's feature array, bypassing pandas
+        features = np.zeros((len(flights), N_FEATURES), dtype=np.float32)
+        for i, (opera, tipovuelo, mes) in enumerate(flights):
+            column = OPERA_COL.get(opera, -1)
+            if column >= 0:
+                features[i, column] = 1
+            column = MES_COL.get(mes, -1)
+            if column >= 0:
+                features[i, column] = 1
+            column = TIPOVUELO_COL.get(tipovuelo, -1)
+            if column >= 0:
+                features[i, column] = 1
         
         # Make predictions
-        predictions = model.predict(features)
+        predictions = model.predict_raw(features)
         
-        return {"predict": predictions}
+        return ORJSONResponse({"predict": predictions})
         
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
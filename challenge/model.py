@@ -1,13 +1,69 @@
+import os
+import hashlib
+import tempfile
 import pandas as pd
 import numpy as np
-from datetime import datetime
-from typing import Tuple, Union, List
+from typing import Any, Dict, Tuple, Union, List
 from sklearn.linear_model import LogisticRegression
 
+DATA_PATH = "data/data.csv"
+# Kept in the service user's own cache dir: outside the source tree (and so the
+# Docker build context) and not in the shared, world-writable temp dir
+MODEL_PATH = os.environ.get(
+    "MODEL_PATH",
+    os.path.join(os.path.expanduser("~"), ".cache", "airlines-delay", "model.npz")
+)
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+def load_data(path: str = DATA_PATH) -> pd.DataFrame:
+    """
+    Read the flights CSV keeping only the columns used by preprocess.
+
+    Args:
+        path (str, optional): CSV file.
+
+    Returns:
+        pd.DataFrame: raw data.
+    """
+    return pd.read_csv(
+        path,
+        usecols=["Fecha-I", "Fecha-O", "OPERA", "TIPOVUELO", "MES"],
+        dtype={"OPERA": "category", "TIPOVUELO": "category", "MES": "int8"},
+        memory_map=True
+    )
+
 class DelayModel:
 
     def __init__(self):
         self._model = None
+        self._coef = None
+        self._intercept = None
+        # Top 10 features identified from DS analysis
+        self._top_10 = [
+            "OPERA_Latin American Wings", 
+            "MES_7",
+            "MES_10",
+            "OPERA_Grupo LATAM",
+            "MES_12",
+            "TIPOVUELO_I",
+            "MES_4",
+            "MES_11",
+            "OPERA_Sky Airline",
+            "OPERA_Copa Air"
+        ]
+        # Parsed (column, value) pairs so one-hot columns can be built directly
+        self._top_10_parsed = [
+            ('OPERA', 'Latin American Wings'),
+            ('MES', 7),
+            ('MES', 10),
+            ('OPERA', 'Grupo LATAM'),
+            ('MES', 12),
+            ('TIPOVUELO', 'I'),
+            ('MES', 4),
+            ('MES', 11),
+            ('OPERA', 'Sky Airline'),
+            ('OPERA', 'Copa Air')
+        ]
 
     def preprocess(
         self,
@@ -26,50 +82,31 @@ class DelayModel:
             or
             pd.DataFrame: features.
         """
-        # Create a copy to avoid modifying original data
-        processed_data = data.copy()
-        
-        # Create features used by the DS
-        processed_data['period_day'] = processed_data['Fecha-I'].apply(self._get_period_day)
-        processed_data['high_season'] = processed_data['Fecha-I'].apply(self._is_high_season)
+        # Derived columns are kept in local arrays; `data` is never copied or modified.
+        # period_day and high_season from the DS analysis are not among the top 10
+        # features, so they are not computed here.
+        derived = {}
         
         # Create min_diff and delay only if Fecha-O exists (for training)
-        if 'Fecha-O' in processed_data.columns:
-            processed_data['min_diff'] = processed_data.apply(self._get_min_diff, axis=1)
-            processed_data['delay'] = np.where(processed_data['min_diff'] > 15, 1, 0)
+        if 'Fecha-O' in data.columns:
+            fecha_i = pd.to_datetime(data['Fecha-I'], format=DATE_FORMAT, cache=True)
+            fecha_o = pd.to_datetime(data['Fecha-O'], format=DATE_FORMAT, cache=True)
+            min_diff = (fecha_o - fecha_i).dt.total_seconds().to_numpy() / 60
+            derived['min_diff'] = min_diff
+            derived['delay'] = np.where(min_diff > 15, 1, 0)
         
-        # Create one-hot encoded features for the top 10 features identified by DS
-        features = pd.concat([
-            pd.get_dummies(processed_data['OPERA'], prefix='OPERA'),
-            pd.get_dummies(processed_data['TIPOVUELO'], prefix='TIPOVUELO'), 
-            pd.get_dummies(processed_data['MES'], prefix='MES')], 
-            axis=1
+        # Build the top 10 one-hot features directly, without intermediate dummies
+        features = pd.DataFrame(
+            self._one_hot_top_10(data),
+            columns=self._top_10,
+            index=data.index
         )
         
-        # Top 10 features identified from DS analysis
-        top_10_features = [
-            "OPERA_Latin American Wings", 
-            "MES_7",
-            "MES_10",
-            "OPERA_Grupo LATAM",
-            "MES_12",
-            "TIPOVUELO_I",
-            "MES_4",
-            "MES_11",
-            "OPERA_Sky Airline",
-            "OPERA_Copa Air"
-        ]
-        
-        # Ensure all features exist (fill missing with 0)
-        for feature in top_10_features:
-            if feature not in features.columns:
-                features[feature] = 0
-                
-        # Select only the top 10 features
-        features = features[top_10_features]
-        
-        if target_column and target_column in processed_data.columns:
-            target = processed_data[[target_column]]
+        if target_column and target_column in derived:
+            target = pd.DataFrame({target_column: derived[target_column]}, index=data.index)
+            return features, target
+        elif target_column and target_column in data.columns:
+            target = data[[target_column]]
             return features, target
         else:
             return features
@@ -87,15 +124,17 @@ class DelayModel:
             target (pd.DataFrame): target.
         """
         # Calculate class weights for balancing (based on DS analysis)
-        n_y0 = len(target[target.iloc[:, 0] == 0])
-        n_y1 = len(target[target.iloc[:, 0] == 1])
+        y = target.values.ravel()
+        counts = np.bincount(y.astype(np.int64), minlength=2)
+        n_y0, n_y1 = int(counts[0]), int(counts[1])
         
         # Use LogisticRegression with class balancing as chosen by DS analysis
         self._model = LogisticRegression(
             class_weight={1: n_y0/len(target), 0: n_y1/len(target)}
         )
         
-        self._model.fit(features, target.values.ravel())
+        self._model.fit(features, y)
+        self._cache_params()
 
     def predict(
         self,
@@ -110,58 +149,133 @@ class DelayModel:
         Returns:
             (List[int]): predicted targets.
         """
-        if self._model is None:
+        return self.predict_raw(features.values)
+
+    def predict_raw(
+        self,
+        features: np.ndarray
+    ) -> List[int]:
+        """
+        Predict delays from an already encoded top 10 feature array.
+
+        Args:
+            features (np.ndarray): array of shape (n, 10), columns ordered as the top 10 features.
+        
+        Returns:
+            (List[int]): predicted targets.
+        """
+        if self._coef is None:
+            self.load(MODEL_PATH)
+        if self._coef is None:
             # Auto-train the model on first prediction using the full dataset
-            data = pd.read_csv("data/data.csv", low_memory=False)
+            data = load_data()
             train_features, target = self.preprocess(data, target_column="delay")
             self.fit(train_features, target)
             
-        predictions = self._model.predict(features)
-        return [int(pred) for pred in predictions]
-
-    def _get_period_day(self, date):
-        """Get period of day from date string"""
-        date_time = datetime.strptime(date, '%Y-%m-%d %H:%M:%S').time()
-        morning_min = datetime.strptime("05:00", '%H:%M').time()
-        morning_max = datetime.strptime("11:59", '%H:%M').time()
-        afternoon_min = datetime.strptime("12:00", '%H:%M').time()
-        afternoon_max = datetime.strptime("18:59", '%H:%M').time()
-        evening_min = datetime.strptime("19:00", '%H:%M').time()
-        evening_max = datetime.strptime("23:59", '%H:%M').time()
-        night_min = datetime.strptime("00:00", '%H:%M').time()
-        night_max = datetime.strptime("4:59", '%H:%M').time()
-        
-        if morning_min <= date_time <= morning_max:
-            return 'mañana'
-        elif afternoon_min <= date_time <= afternoon_max:
-            return 'tarde'
-        elif (evening_min <= date_time <= evening_max) or (night_min <= date_time <= night_max):
-            return 'noche'
-
-    def _is_high_season(self, fecha):
-        """Check if date is in high season"""
-        fecha_año = int(fecha.split('-')[0])
-        fecha = datetime.strptime(fecha, '%Y-%m-%d %H:%M:%S')
-        range1_min = datetime.strptime(f'15-Dec-{fecha_año}', '%d-%b-%Y')
-        range1_max = datetime.strptime(f'31-Dec-{fecha_año}', '%d-%b-%Y')
-        range2_min = datetime.strptime(f'1-Jan-{fecha_año}', '%d-%b-%Y')
-        range2_max = datetime.strptime(f'3-Mar-{fecha_año}', '%d-%b-%Y')
-        range3_min = datetime.strptime(f'15-Jul-{fecha_año}', '%d-%b-%Y')
-        range3_max = datetime.strptime(f'31-Jul-{fecha_año}', '%d-%b-%Y')
-        range4_min = datetime.strptime(f'11-Sep-{fecha_año}', '%d-%b-%Y')
-        range4_max = datetime.strptime(f'30-Sep-{fecha_año}', '%d-%b-%Y')
+        # Plain decision function; avoids sklearn's per-call validation overhead
+        scores = np.asarray(features, dtype=np.float32) @ self._coef + self._intercept
+        return (scores > 0).astype(int).tolist()
+
+    def feature_columns(self) -> Dict[str, Dict[Any, int]]:
+        """
+        Map each raw field value used by the top 10 features to its column.
+
+        Returns:
+            Dict[str, Dict[Any, int]]: field -> value -> column index.
+        """
+        columns = {}
+        for column, (field, value) in enumerate(self._top_10_parsed):
+            columns.setdefault(field, {})[value] = column
+        return columns
+
+    def save(
+        self,
+        path: str = MODEL_PATH,
+        data_path: str = DATA_PATH
+    ) -> None:
+        """
+        Persist the fitted model parameters with a fingerprint of what produced them.
+
+        Only plain arrays are stored, and the file is written to a temporary
+        name and then renamed, so concurrent workers never leave a partial file.
+
+        Args:
+            path (str, optional): destination file.
+            data_path (str, optional): CSV the model was trained on.
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(
+                    f,
+                    data_hash=np.array(self._data_hash(data_path)),
+                    features=np.array(self._top_10),
+                    coef=self._model.coef_,
+                    intercept=self._model.intercept_,
+                    classes=self._model.classes_
+                )
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+    def load(
+        self,
+        path: str = MODEL_PATH,
+        data_path: str = DATA_PATH
+    ) -> bool:
+        """
+        Restore model parameters saved with `save`, skipping training.
+
+        The file is ignored when it is missing, unreadable, or was produced from
+        a different training CSV or feature layout.
+
+        Args:
+            path (str, optional): source file.
+            data_path (str, optional): CSV the model must have been trained on.
+
+        Returns:
+            bool: whether the parameters were loaded.
+        """
+        try:
+            with np.load(path, allow_pickle=False) as saved:
+                data_hash = str(saved['data_hash'])
+                features = saved['features'].tolist()
+                coef, intercept, classes = saved['coef'], saved['intercept'], saved['classes']
+            if data_hash != self._data_hash(data_path) or features != self._top_10:
+                return False
+        except Exception:
+            return False
         
-        if ((fecha >= range1_min and fecha <= range1_max) or 
-            (fecha >= range2_min and fecha <= range2_max) or 
-            (fecha >= range3_min and fecha <= range3_max) or
-            (fecha >= range4_min and fecha <= range4_max)):
-            return 1
-        else:
-            return 0
-
-    def _get_min_diff(self, data):
-        """Calculate minute difference between actual and scheduled time"""
-        fecha_o = datetime.strptime(data['Fecha-O'], '%Y-%m-%d %H:%M:%S')
-        fecha_i = datetime.strptime(data['Fecha-I'], '%Y-%m-%d %H:%M:%S')
-        min_diff = ((fecha_o - fecha_i).total_seconds())/60
-        return min_diff
\ No newline at end of file
+        self._model = LogisticRegression()
+        self._model.coef_ = coef
+        self._model.intercept_ = intercept
+        self._model.classes_ = classes
+        self._model.n_features_in_ = coef.shape[1]
+        self._model.feature_names_in_ = np.array(self._top_10, dtype=object)
+        self._cache_params()
+        return True
+
+    def _data_hash(self, data_path):
+        """Identify the training data a saved model belongs to"""
+        digest = hashlib.sha256()
+        with open(data_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def _cache_params(self):
+        """Keep the fitted coefficients in a shape ready for a dot product"""
+        self._coef = self._model.coef_.ravel().astype(np.float32)
+        self._intercept = float(self._model.intercept_[0])
+
+    def _one_hot_top_10(self, data):
+        """Materialize the top 10 one-hot features as an int8 array"""
+        # Pull each source column out of the frame once rather than once per feature
+        columns = {column: data[column].to_numpy() for column in ('OPERA', 'TIPOVUELO', 'MES')}
+        arr = np.zeros((len(data), len(self._top_10_parsed)), dtype=np.int8)
+        for i, (column, value) in enumerate(self._top_10_parsed):
+            arr[:, i] = columns[column] == value
+        return arr
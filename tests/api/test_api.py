@@ -1,7 +1,12 @@
+import threading
 import unittest
+import pandas as pd
+from unittest.mock import patch
 
 from fastapi.testclient import TestClient
 from challenge import app
+from challenge import api
+from challenge.api import model
 
 
 class TestBatchPipeline(unittest.TestCase):
@@ -64,4 +69,52 @@ class TestBatchPipeline(unittest.TestCase):
         }
         # when("xgboost.XGBClassifier").predict(ANY).thenReturn(np.array([0]))
         response = self.client.post("/predict", json=data)
-        self.assertEqual(response.status_code, 400)
\ No newline at end of file
+        self.assertEqual(response.status_code, 400)
+
+    def test_should_return_unavailable_when_model_not_trained(self):
+        data = {
+            "flights": [
+                {
+                    "OPERA": "Aerolineas Argentinas", 
+                    "TIPOVUELO": "N", 
+                    "MES": 3
+                }
+            ]
+        }
+        with patch("challenge.api.trained", False):
+            response = self.client.post("/predict", json=data)
+        self.assertEqual(response.status_code, 503)
+
+    def test_should_failed_before_model_is_ready(self):
+        data = {
+            "flights": [
+                {
+                    "OPERA": "Aerolineas Argentinas", 
+                    "TIPOVUELO": "N", 
+                    "MES": 13
+                }
+            ]
+        }
+        with patch("challenge.api.ready", threading.Event()):
+            response = self.client.post("/predict", json=data)
+        self.assertEqual(response.status_code, 400)
+
+    def test_should_match_model_for_top_features(self):
+        flights = [
+            {"OPERA": "Grupo LATAM", "TIPOVUELO": "I", "MES": 7},
+            {"OPERA": "Sky Airline", "TIPOVUELO": "N", "MES": 12},
+            {"OPERA": "Copa Air", "TIPOVUELO": "I", "MES": 4},
+            {"OPERA": "Latin American Wings", "TIPOVUELO": "N", "MES": 10},
+            {"OPERA": "Aerolineas Argentinas", "TIPOVUELO": "I", "MES": 11}
+        ]
+        response = self.client.post("/predict", json={"flights": flights})
+        expected = model.predict(model.preprocess(pd.DataFrame(flights)))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"predict": expected})
+
+    def test_should_serve_when_model_cache_write_fails(self):
+        with patch.object(model, "load", return_value=False), \
+                patch.object(model, "save", side_effect=OSError("read-only")), \
+                patch("challenge.api.trained", False):
+            api._train()
+            self.assertTrue(api.trained)
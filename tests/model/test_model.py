@@ -1,3 +1,5 @@
+import os
+import tempfile
 import unittest
 import pandas as pd
 
@@ -100,4 +102,52 @@ class TestModel(unittest.TestCase):
 
         assert isinstance(predicted_targets, list)
         assert len(predicted_targets) == features.shape[0]
-        assert all(isinstance(predicted_target, int) for predicted_target in predicted_targets)
\ No newline at end of file
+        assert all(isinstance(predicted_target, int) for predicted_target in predicted_targets)
+
+    def test_model_save_and_load(
+        self
+    ):
+        features, target = self.model.preprocess(
+            data=self.data,
+            target_column="delay"
+        )
+
+        self.model.fit(
+            features=features,
+            target=target
+        )
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "model.npz")
+            self.model.save(path)
+
+            loaded_model = DelayModel()
+            assert loaded_model.load(path)
+
+        assert loaded_model.predict(features) == self.model.predict(features)
+
+    def test_model_load_ignores_stale_file(
+        self
+    ):
+        features, target = self.model.preprocess(
+            data=self.data.head(1000),
+            target_column="delay"
+        )
+
+        self.model.fit(
+            features=features,
+            target=target
+        )
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "model.npz")
+            data_path = os.path.join(tmp_dir, "data.csv")
+            self.data.head(1000).to_csv(data_path, index=False)
+            self.model.save(path, data_path=data_path)
+
+            loaded_model = DelayModel()
+            assert loaded_model.load(path, data_path=data_path)
+
+            self.data.head(2000).to_csv(data_path, index=False)
+            assert not DelayModel().load(path, data_path=data_path)
+            assert not DelayModel().load(os.path.join(tmp_dir, "missing.npz"))